@@ -1,9 +1,11 @@
-import geopy
-import geopy.distance
 import argparse
+import sys
 
-from utils.bearings_utils import parse_bearing
-from utils.file_utils import read_from_file, get_row_val, read_headers_from_file, InvalidHeaders
+import numpy as np
+from pyproj import Geod
+
+from utils.bearings_utils import parse_bearing, spherical_path
+from utils.file_utils import read_from_file, read_headers_from_file, InvalidHeaders
 
 parser = argparse.ArgumentParser(
     prog="bearingstogps",
@@ -62,7 +64,22 @@ parser.add_argument(
     ),
     dest="units",
 )
+parser.add_argument(
+    "--fast",
+    action="store_true",
+    help=(
+        "Compute legs of up to 5 km using a spherical earth instead of the WGS-84 ellipsoid.  This is faster, but "
+        "approximate (off by up to about 0.6%% of each leg's distance).  Longer legs are always computed on the "
+        "ellipsoid."
+    ),
+)
+
 
+# Feet per pole/rod, and meters per foot (which is what pyproj works in)
+FEET_PER_POLE = 16.5
+METERS_PER_FOOT = 0.3048
+# The longest leg (in meters) that --fast will compute on a sphere
+FAST_MAX_LEG_M = 5000.0
 
 args = vars(parser.parse_args())
 
@@ -75,25 +92,69 @@ data = read_from_file(args["infile"], dtype={"bearing": str, "distance": float})
 
 lat = args["lat"]
 lon = args["lon"]
-points = [geopy.Point(lat, lon)]
-
-print("lon,lat,zero")
-print(f"{lon},{lat},0")
 
-for _, row in data.iterrows():
-    distance = get_row_val(row, "distance")  # feet
-    bearing_str = get_row_val(row, "bearing")  # e.g. south 88º 27' 0" east
-
-    if args["units"] == "poles" or args["units"] == "rods":
-        distance *= 16.5
-
-    # print(f"Input: {bearing_str}")
-    bearing = parse_bearing(bearing_str)
-    # print(f"bearing: {bearing} type: {type(bearing).__name__}")
-    start_point = points[-1]
-
-    end_point = geopy.distance.geodesic(feet=distance).destination(start_point, bearing)
-
-    points.append(end_point)
-
-    print(f"{end_point.longitude},{end_point.latitude},0")
+# Convert the input units to meters once, instead of scaling every row
+meters_factor = METERS_PER_FOOT
+if args["units"] == "poles" or args["units"] == "rods":
+    meters_factor *= FEET_PER_POLE
+
+# pyproj's Geod.fwd solves the direct geodesic problem in compiled code (the same WGS-84 solution geopy computes in
+# pure python)
+geod = Geod(ellps="WGS84")
+
+# Pull the 2 columns out once instead of building a Series per row
+distances_col = data["distance"].to_numpy(dtype=np.float64) * meters_factor  # meters
+num_legs = len(distances_col)
+# A missing (e.g. null in parquet) or infinite distance would make this and every following point NaN
+bad_distance_rows = np.flatnonzero(~np.isfinite(distances_col))
+if len(bad_distance_rows) > 0:
+    raise ValueError(
+        f"Missing (or non-finite) distance(s) on data row(s) {(bad_distance_rows + 1).tolist()} in {args['infile']}."
+    )
+
+# Blank bearings (which parse_bearing would take to mean due north) are missing values
+bearings_col = data["bearing"].str.strip().replace({"": np.nan, "nan": np.nan})
+
+# Bearings tend to repeat, so each unique bearing string (e.g. south 88º 27' 0" east) is only parsed once, and the
+# results are mapped back onto the rows by category code
+bearings_cat = bearings_col.astype("category").cat
+bearing_codes = bearings_cat.codes.to_numpy()
+# Missing, blank, and whitespace-only bearings (all NaN by now) have no category (i.e. code -1), which would otherwise
+# silently index the last parsed bearing
+missing_bearing_rows = np.flatnonzero(bearing_codes == -1)
+if len(missing_bearing_rows) > 0:
+    raise ValueError(
+        f"Missing (blank) bearing(s) on data row(s) {(missing_bearing_rows + 1).tolist()} in {args['infile']}."
+    )
+unique_bearings = np.fromiter(
+    (parse_bearing(bearing_str) for bearing_str in bearings_cat.categories),
+    dtype=np.float64,
+    count=len(bearings_cat.categories),
+)
+bearings = unique_bearings[bearing_codes]
+
+# Each leg starts where the last one ended.  Legs on the ellipsoid are computed one at a time.  With --fast, the runs of
+# short legs between them are computed on a sphere, all at once.
+if args["fast"]:
+    ellipsoid_legs = np.flatnonzero(distances_col > FAST_MAX_LEG_M).tolist()
+else:
+    ellipsoid_legs = range(num_legs)
+# Each point's output line is formatted as soon as it is computed, directly into its slot of the output (after the
+# header and the starting point), which is written all at once at the end (instead of a print() per point)
+out = [""] * (num_legs + 2)
+out[0] = "lon,lat,zero\n"
+out[1] = f"{lon},{lat},0\n"
+run_start = 0
+for leg in [*ellipsoid_legs, num_legs]:
+    if leg > run_start:
+        run_lats, run_lons = spherical_path(lat, lon, bearings[run_start:leg], distances_col[run_start:leg])
+        run_lats = run_lats.tolist()
+        run_lons = run_lons.tolist()
+        out[run_start + 2 : leg + 2] = [f"{run_lon},{run_lat},0\n" for run_lon, run_lat in zip(run_lons, run_lats)]
+        lat, lon = run_lats[-1], run_lons[-1]
+    if leg < num_legs:
+        lon, lat, _ = geod.fwd(lon, lat, bearings[leg], distances_col[leg])
+        out[leg + 2] = f"{lon},{lat},0\n"
+    run_start = leg + 1
+
+sys.stdout.write("".join(out))
@@ -1,8 +1,35 @@
-import re
+import functools
+import math
+
+import numpy as np
+
+
+class _AngleTranslationTable(dict):
+    """str.translate table that turns every character other than those of a number into a space, so that the numbers in
+    an angle can be split apart.  Characters not already in the table (e.g. non-ASCII ones, like °) are added on first
+    lookup.
+    """
+
+    def __missing__(self, char_ord):
+        self[char_ord] = " "
+        return " "
+
+
+# For parsing bearings.  The letters of the cardinal direction words (north, south, east, west) delimit the angle, and
+# the characters of a number delimit the degrees, minutes, and seconds inside it.
+_CARDINAL_CHARS = frozenset("northsuaew")
+_ANGLE_CHARS = frozenset("+-.0123456789")
+_ANGLE_TABLE = _AngleTranslationTable(
+    {char_ord: (chr(char_ord) if chr(char_ord) in _ANGLE_CHARS else " ") for char_ord in range(128)}
+)
+
+# Mean radius of the earth (IUGG), in meters
+EARTH_RADIUS_M = 6371008.8
+
+# The fewest legs for which the spherical walk is compiled with numba (if it is installed).  Importing numba and loading
+# its (cached) compiled code takes about half a second, which is more than it saves on shorter runs.
+JIT_MIN_LEGS = 1000000
 
-# For parsing bearings
-bearing_pat = re.compile(r"([SOUTHsouthEAeaWwNRnr]*)\s*([^SOUTHsouthEAeaWwNRnr]*)\s*([SOUTHsouthEAeaWwNRnr]*)")
-angle_pat = re.compile(r"([\+\-\.0-9]*)[^\+\-\.0-9]*([\+\-\.0-9]*)[^\+\-\.0-9]*([\+\-\.0-9]*)")
 
 def parse_bearing(bearing_str) -> float:
     """Takes a string like south 37 26 50 east and converts it to a single decimal value describing degrees clockwise
@@ -19,84 +46,81 @@ def parse_bearing(bearing_str) -> float:
         bearing (float): Value between 0-360
     """
 
+    # Normalize the case and surrounding whitespace so that equivalent bearings share a cache entry
+    try:
+        return _parse_bearing(bearing_str.strip().lower())
+    except ValueError as ve:
+        # Report the bearing as it was supplied, not as it was normalized
+        raise ValueError(f"Invalid bearing [{bearing_str}]: {ve}") from ve
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_bearing(bearing_str) -> float:
+    # Survey legs often repeat the same bearing, and parsing is pure, so results are cached by string.  Note, the string
+    # is expected to be stripped and lower-cased (see parse_bearing).
     init = "north"
     dir = "east"
     bearing = 0.0  # in degrees eastward of North (0 - 360 degrees)
     angle_dir = 1  # 1 or -1
 
-    bearing_match = re.search(bearing_pat, bearing_str)
-
-    if bearing_match:
-        bearing_groups = bearing_match.groups()
-
-        init_str = bearing_groups[0]
-        angle_str = bearing_groups[1].strip()
-        dir_str = bearing_groups[2]
-
-        if init_str.startswith("E") or init_str.startswith("e"):
-            init = "east"
-            bearing = 90.0
-        elif init_str.startswith("S") or init_str.startswith("s"):
-            init = "south"
-            bearing = 180.0
-        elif init_str.startswith("W") or init_str.startswith("w"):
-            init = "east"
-            bearing = 270.0
-
-        if dir_str.startswith("S") or dir_str.startswith("s"):
-            dir = "south"
-            if init == "west":
-                angle_dir = -1
-        elif dir_str.startswith("N") or dir_str.startswith("n"):
-            dir = "north"
-            if init == "east":
-                bearing = 360.0
-                angle_dir = -1
-        elif dir_str.startswith("W") or dir_str.startswith("w"):
-            dir = "west"
-            if init == "north":
-                angle_dir = -1
-        else:  # east
-            if init == "south":
-                angle_dir = -1
-        # print(f"Init parse: init: {init_str} -> {init} angle: [{angle_str}] -> {angle_dir} dir: {dir_str} -> {dir} init bearing: {bearing}")
-
-        if (
-            ((init == "south" or init == "north") and (dir == "south" or dir == "north"))
-            or ((init == "west" or init == "east") and (dir == "west" or dir == "east"))
-        ):
-            raise ValueError(
-                f"Invalid initial and directional cardinal directions: {init}, {dir} parsed from bearing: "
-                f"{bearing_str}.  Cannot be the same or opposing."
-            )
-
-        angle_match = re.search(angle_pat, angle_str)
-
-        if angle_match:
-            angle_groups = angle_match.groups()
-
-            degrees_str = angle_groups[0]
-            minutes_str = angle_groups[1]
-            seconds_str = angle_groups[2]
-
-            degrees_diff = 0.0
-            minutes_diff = 0.0
-            seconds_diff = 0.0
-
-            if degrees_str != "":
-                degrees_diff = angle_dir * float(degrees_str)
-                bearing += degrees_diff
-            if minutes_str != "":
-                minutes_diff = angle_dir * float(minutes_str) / 60
-                bearing += minutes_diff
-            if seconds_str != "":
-                seconds_diff = angle_dir * float(seconds_str) / 3600
-                bearing += seconds_diff
-            # print(f"angle parse: angle str: {angle_str} degrees: {degrees_str} -> {degrees_diff} minutes: {minutes_str} -> {minutes_diff} seconds: {seconds_str} -> {seconds_diff} new bearing: {bearing}")
-        else:
-            raise ValueError(f"Could not parse angle: {angle_str}.")
-    else:
-        raise ValueError(f"Could not parse bearing: {bearing_str}.")
+    # Walk the string once: [initial direction word] [angle] [direction word].  Anything after that is ignored.
+    end = len(bearing_str)
+    pos = 0
+    while pos < end and bearing_str[pos] in _CARDINAL_CHARS:
+        pos += 1
+    init_str = bearing_str[:pos]
+    angle_start = pos
+    while pos < end and bearing_str[pos] not in _CARDINAL_CHARS:
+        pos += 1
+    angle_str = bearing_str[angle_start:pos].strip()
+    dir_start = pos
+    while pos < end and bearing_str[pos] in _CARDINAL_CHARS:
+        pos += 1
+    dir_str = bearing_str[dir_start:pos]
+
+    if init_str.startswith("e"):
+        init = "east"
+        bearing = 90.0
+    elif init_str.startswith("s"):
+        init = "south"
+        bearing = 180.0
+    elif init_str.startswith("w"):
+        init = "east"
+        bearing = 270.0
+
+    if dir_str.startswith("s"):
+        dir = "south"
+        if init == "west":
+            angle_dir = -1
+    elif dir_str.startswith("n"):
+        dir = "north"
+        if init == "east":
+            bearing = 360.0
+            angle_dir = -1
+    elif dir_str.startswith("w"):
+        dir = "west"
+        if init == "north":
+            angle_dir = -1
+    else:  # east
+        if init == "south":
+            angle_dir = -1
+
+    if (
+        ((init == "south" or init == "north") and (dir == "south" or dir == "north"))
+        or ((init == "west" or init == "east") and (dir == "west" or dir == "east"))
+    ):
+        raise ValueError(
+            f"Invalid initial and directional cardinal directions: {init}, {dir}.  Cannot be the same or opposing."
+        )
+
+    # Collect up to 3 numbers (degrees, minutes, seconds), delimited by any other characters
+    angle_vals = angle_str.translate(_ANGLE_TABLE).split()[:3]
+
+    try:
+        for angle_unit, angle_val in zip((1, 60, 3600), angle_vals):
+            bearing += angle_dir * float(angle_val) / angle_unit
+    except ValueError:
+        raise ValueError(f"Could not parse angle [{angle_str}].")
 
     if bearing < 0:
         bearing += 360.0
@@ -105,3 +129,67 @@ def parse_bearing(bearing_str) -> float:
         raise ValueError(f"Invalid bearing result: {bearing}.")
 
     return bearing
+
+
+def spherical_path(lat, lon, bearings, dists_m):
+    """Computes the destinations of a series of legs (each starting where the previous one ended) from a starting
+    coordinate, treating the earth as a sphere.  This is much cheaper than solving the geodesics on the WGS-84
+    ellipsoid, but is only an approximation (off by up to about 0.6% of each leg's distance), so it is only suitable for
+    short legs.
+    Args:
+        lat (float): Starting latitude in degrees
+        lon (float): Starting longitude in degrees
+        bearings (numpy array of floats): Degrees clockwise of north (e.g. from parse_bearing) of each leg
+        dists_m (numpy array of floats): Distance in meters of each leg
+    Exceptions:
+        None
+    Returns:
+        lats (numpy array of floats): Destination latitude in degrees of each leg
+        lons (numpy array of floats): Destination longitude in degrees of each leg, between -180 and 180
+    """
+    # The legs are sequential, but the trigonometry of the bearings and distances is not, so it is done up front
+    bearings_rad = np.radians(bearings)
+    angular_dists = np.asarray(dists_m, dtype=np.float64) / EARTH_RADIUS_M
+
+    trig = (np.sin(bearings_rad), np.cos(bearings_rad), np.sin(angular_dists), np.cos(angular_dists))
+
+    if len(angular_dists) >= JIT_MIN_LEGS:
+        walk_sphere = _get_jitted_walk_sphere()
+    else:
+        walk_sphere = _walk_sphere
+    if walk_sphere is _walk_sphere:
+        # Plain python indexes lists much faster than numpy arrays
+        trig = tuple(t.tolist() for t in trig)
+
+    return walk_sphere(math.radians(lat), math.radians(lon), *trig)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_jitted_walk_sphere():
+    # numba is optional (and slow to import), so it is only imported when it is worth using
+    try:
+        from numba import njit
+    except ImportError:
+        return _walk_sphere
+    # Caching the compiled code to disk saves recompiling it on every run
+    return njit(cache=True)(_walk_sphere)
+
+
+def _walk_sphere(lat, lon, sin_bearings, cos_bearings, sin_dists, cos_dists):
+    # Note, lat and lon are in radians.  Only the scalar update of the latitude and longitude is left to this loop.
+    num_legs = len(sin_bearings)
+    lats = np.empty(num_legs)
+    lons = np.empty(num_legs)
+    sin_lat = math.sin(lat)
+    cos_lat = math.cos(lat)
+
+    for i in range(num_legs):
+        sin_lat2 = sin_lat * cos_dists[i] + cos_lat * sin_dists[i] * cos_bearings[i]
+        lon += math.atan2(sin_bearings[i] * sin_dists[i] * cos_lat, cos_dists[i] - sin_lat * sin_lat2)
+        lat = math.asin(sin_lat2)
+        sin_lat = sin_lat2
+        cos_lat = math.cos(lat)
+        lats[i] = math.degrees(lat)
+        lons[i] = (math.degrees(lon) + 540.0) % 360.0 - 180.0
+
+    return lats, lons
@@ -1,11 +1,34 @@
+import functools
+import os
 import pathlib
-from zipfile import BadZipFile
+from collections import Counter
+from zipfile import BadZipFile, is_zipfile
 from typing import Optional
 
 import pandas as pd
 import yaml
 from openpyxl.utils.exceptions import InvalidFileException
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    # pyarrow's multithreaded parser is several times faster than pandas' default C engine on large files
+    _CSV_ENGINE = "pyarrow"
+except ImportError:
+    _CSV_ENGINE = "c"
+
+try:
+    import python_calamine  # noqa: F401
+
+    # The (rust) calamine engine is many times faster than openpyxl, but pandas only supports it as of version 2.2
+    if tuple(int(v) for v in pd.__version__.split(".")[:2]) >= (2, 2):
+        _EXCEL_ENGINE = "calamine"
+    else:
+        _EXCEL_ENGINE = "openpyxl"
+except ImportError:
+    _EXCEL_ENGINE = "openpyxl"
+
 
 def read_from_file(
     filepath,
@@ -16,18 +39,21 @@ def read_from_file(
     dropna=True,
     na_values=None,
     expected_headers=None,
+    all_columns=False,
 ):
     """Converts either an excel or tab delimited file into a dataframe.
 
     Args:
         filepath (str): Path to infile
         sheet (str): Name of excel sheet
-        filetype (str): Enumeration ["csv", "tsv", "excel", "yaml"]
+        filetype (str): Enumeration ["csv", "tsv", "excel", "parquet", "yaml"]
         dtype (Dict(str)): header: type
         keep_default_na (bool): The keep_default_na arg to pandas
         dropna (bool): Whether to drop na
         na_values (bool): The na_values arg to pandas
         expected_headers (List(str)): List of all expected header names
+        all_columns (bool): Whether to read all columns, even when a dtype dict is supplied (otherwise, only the
+            columns in dtype are read)
 
     Raises:
         ValueError
@@ -48,6 +74,7 @@ def read_from_file(
             na_values=na_values,
             dtype=dtype,
             expected_headers=expected_headers,
+            all_columns=all_columns,
         )
     elif filetype == "tsv":
         retval = _read_from_tsv(
@@ -57,6 +84,7 @@ def read_from_file(
             dropna=dropna,
             na_values=na_values,
             expected_headers=expected_headers,
+            all_columns=all_columns,
         )
     elif filetype == "csv":
         retval = _read_from_csv(
@@ -66,6 +94,15 @@ def read_from_file(
             dropna=dropna,
             na_values=na_values,
             expected_headers=expected_headers,
+            all_columns=all_columns,
+        )
+    elif filetype == "parquet":
+        retval = _read_from_parquet(
+            filepath,
+            dtype=dtype,
+            dropna=dropna,
+            expected_headers=expected_headers,
+            all_columns=all_columns,
         )
     elif filetype == "yaml":
         retval = _read_from_yaml(filepath)
@@ -78,14 +115,16 @@ def _check_dtype_arg(
     result,
     sheet=0,
     dtype=None,
+    headers=None,
 ):
     # Error-check the dtype argument supplied
     if dtype is not None and len(dtype.keys()) > 0 and result is not None:
         # This assumes the retval is a dataframe
-        missing = []
-        for dtk in dtype.keys():
-            if dtk not in result.columns:
-                missing.append(dtk)
+        columns = set(result.columns)
+        missing = [dtk for dtk in dtype.keys() if dtk not in columns]
+        # The result may only contain the dtype columns (see _get_usecols), so report all of the file's columns
+        if headers is None:
+            headers = list(result.columns)
         if len(missing) == len(dtype.keys()):
             # None of the keys are present in the dataframe
             # Raise programming errors immediately
@@ -93,14 +132,14 @@ def _check_dtype_arg(
                 dtype,
                 file=filepath,
                 sheet=sheet,
-                columns=list(result.columns),
+                columns=headers,
             )
         elif len(missing) > 0:
             idk = InvalidDtypeKeys(
                 missing,
                 file=filepath,
                 sheet=sheet,
-                columns=list(result.columns),
+                columns=headers,
             )
             # Some columns may be optional, so if at least 1 is correct, just issue a warning.
             print(f"WARNING: {type(idk).__name__}: {idk}")
@@ -116,7 +155,7 @@ def read_headers_from_file(
     Args:
         filepath (str): Path to infile
         sheet (str): Name of excel sheet
-        filetype (str): Enumeration ["csv", "tsv", "excel", "yaml"]
+        filetype (str): Enumeration ["csv", "tsv", "excel", "parquet", "yaml"]
         expected_headers (List(str)): List of all expected header names
 
     Raises:
@@ -134,6 +173,8 @@ def read_headers_from_file(
         retval = _read_headers_from_tsv(filepath)
     elif filetype == "csv":
         retval = _read_headers_from_csv(filepath)
+    elif filetype == "parquet":
+        retval = _read_headers_from_parquet(filepath)
     elif filetype == "yaml":
         raise ValueError(
             'Invalid file type: "%s", yaml files do not have headers', filetype
@@ -143,11 +184,12 @@ def read_headers_from_file(
 
 
 def _get_file_type(filepath, filetype=None):
-    filetypes = ["csv", "tsv", "excel", "yaml"]
+    filetypes = ["csv", "tsv", "excel", "parquet", "yaml"]
     extensions = {
         "csv": "csv",
         "tsv": "tsv",
         "xlsx": "excel",
+        "parquet": "parquet",
         "yaml": "yaml",
         "yml": "yaml",
     }
@@ -159,6 +201,9 @@ def _get_file_type(filepath, filetype=None):
             filetype = extensions[ext]
         else:
             try:
+                # Only bother having openpyxl open the file if it could be an xlsx file
+                if not _is_zip_file(filepath):
+                    raise BadZipFile(f"File is not a zip file: {filepath}")
                 pd.ExcelFile(filepath, engine="openpyxl")
                 filetype = "excel"
             except (InvalidFileException, ValueError, BadZipFile):  # type: ignore
@@ -177,6 +222,14 @@ def _get_file_type(filepath, filetype=None):
     return filetype
 
 
+def _is_zip_file(filepath):
+    """Cheaply determines whether a file is a zip archive (which is what an xlsx file is), by its signature."""
+    with open(filepath, "rb") as infile:
+        if infile.read(4) != b"PK\x03\x04":
+            return False
+    return is_zipfile(filepath)
+
+
 def _read_from_yaml(filepath):
     with open(filepath) as headers_file:
         return yaml.safe_load(headers_file)
@@ -190,6 +243,7 @@ def _read_from_xlsx(
     dropna=True,
     expected_headers=None,
     na_values=None,
+    all_columns=False,
 ):
     sheet_name = sheet
     sheets = get_sheet_names(filepath)
@@ -221,6 +275,7 @@ def _read_from_xlsx(
                 # TODO: Add support for expected headers
                 # expected_headers=None,
                 na_values=na_values,
+                all_columns=all_columns,
             )
 
         return df_dict
@@ -236,9 +291,10 @@ def _read_from_xlsx(
         sheet_name = 0
 
     try:
+        headers = _read_headers_from_xlsx(filepath, sheet=sheet_name)
         validate_headers(
             filepath,
-            _read_headers_from_xlsx(filepath, sheet=sheet_name),
+            headers,
             expected_headers,
         )
     except IndexError as ie:
@@ -252,13 +308,16 @@ def _read_from_xlsx(
 
     kwargs = {
         "sheet_name": sheet_name,
-        "engine": "openpyxl",
+        "engine": _EXCEL_ENGINE,
         "keep_default_na": keep_default_na,
     }
     if dtype is not None:
         kwargs["dtype"] = dtype
     if na_values is not None:
         kwargs["na_values"] = na_values
+    usecols = _get_usecols(headers, dtype=dtype, all_columns=all_columns)
+    if usecols is not None:
+        kwargs["usecols"] = usecols
 
     df = pd.read_excel(filepath, **kwargs, comment="#")
 
@@ -282,6 +341,7 @@ def _read_from_xlsx(
         df,
         sheet=sheet,
         dtype=dtype,
+        headers=headers,
     )
 
     return df
@@ -294,16 +354,21 @@ def _read_from_tsv(
     dropna=True,
     expected_headers=None,
     na_values=None,
+    all_columns=False,
 ):
+    headers = _read_headers_from_tsv(filepath)
     kwargs = _collect_kwargs(
-        keep_default_na=keep_default_na, na_values=na_values, dtype=dtype
+        keep_default_na=keep_default_na,
+        na_values=na_values,
+        dtype=dtype,
+        usecols=_get_usecols(headers, dtype=dtype, all_columns=all_columns),
     )
 
-    df = pd.read_table(filepath, **kwargs, comment="#")
+    df = _read_delimited(filepath, kwargs, headers, sep="\t")
 
     validate_headers(
         filepath,
-        _read_headers_from_tsv(filepath),
+        headers,
         expected_headers,
     )
 
@@ -317,6 +382,7 @@ def _read_from_tsv(
         filepath,
         df,
         dtype=dtype,
+        headers=headers,
     )
 
     return df
@@ -329,16 +395,21 @@ def _read_from_csv(
     dropna=True,
     expected_headers=None,
     na_values=None,
+    all_columns=False,
 ):
+    headers = _read_headers_from_csv(filepath)
     kwargs = _collect_kwargs(
-        keep_default_na=keep_default_na, na_values=na_values, dtype=dtype
+        keep_default_na=keep_default_na,
+        na_values=na_values,
+        dtype=dtype,
+        usecols=_get_usecols(headers, dtype=dtype, all_columns=all_columns),
     )
 
-    df = pd.read_csv(filepath, **kwargs, comment="#")
+    df = _read_delimited(filepath, kwargs, headers, sep=",")
 
     validate_headers(
         filepath,
-        _read_headers_from_csv(filepath),
+        headers,
         expected_headers,
     )
 
@@ -352,12 +423,55 @@ def _read_from_csv(
         filepath,
         df,
         dtype=dtype,
+        headers=headers,
     )
 
     return df
 
 
-def _collect_kwargs(dtype=None, keep_default_na=False, na_values=None):
+def _read_from_parquet(
+    filepath,
+    dtype=None,
+    dropna=True,
+    expected_headers=None,
+    all_columns=False,
+):
+    headers = _read_headers_from_parquet(filepath)
+
+    validate_headers(
+        filepath,
+        headers,
+        expected_headers,
+    )
+
+    # Parquet is columnar, so when we know which columns are wanted, only those are read from disk
+    df = pd.read_parquet(
+        filepath,
+        engine="pyarrow",
+        columns=_get_usecols(headers, dtype=dtype, all_columns=all_columns),
+    )
+
+    # Drop empty (null) rows before casting, since casting can turn nulls into values (e.g. None into "None")
+    if dropna:
+        df = df.dropna(axis=0, how="all")
+
+    if dtype is not None:
+        # Unlike the text formats, parquet columns can contain nulls, so only the non-null values are cast
+        for k, v in dtype.items():
+            if k in df.columns:
+                df[k] = df[k].astype(v).where(df[k].notna())
+
+    _check_dtype_arg(
+        filepath,
+        df,
+        dtype=dtype,
+        headers=headers,
+    )
+
+    return df
+
+
+def _collect_kwargs(dtype=None, keep_default_na=False, na_values=None, usecols=None):
     """
     Compiles a dict with keep_default_na and only the remaining keyword arguments that have values.
 
@@ -368,9 +482,105 @@ def _collect_kwargs(dtype=None, keep_default_na=False, na_values=None):
         kwargs["na_values"] = na_values
     if dtype is not None:
         kwargs["dtype"] = dtype
+    if usecols is not None:
+        kwargs["usecols"] = usecols
     return kwargs
 
 
+def _get_usecols(headers, dtype=None, all_columns=False):
+    """Returns the columns to read from a file: the dtype keys that are among the file's headers, or None (for all
+    columns) if all_columns is True, there is no dtype, or none of its keys are headers.
+
+    Note, dtype keys missing from the file are left out (instead of letting pandas raise), so that they are reported by
+    _check_dtype_arg.
+    """
+    if all_columns or dtype is None:
+        return None
+    usecols = [k for k in dtype.keys() if k in headers]
+    if len(usecols) == 0:
+        return None
+    return usecols
+
+
+def _read_delimited(filepath, kwargs, headers, sep=",", comment="#"):
+    """Reads a delimited file into a dataframe, using pyarrow's parser when it will produce the same dataframe that
+    pandas' C engine would, and the C engine otherwise (see _read_delimited_with_pyarrow).
+
+    Args:
+        filepath (str): Path to infile
+        kwargs (dict): pandas read_csv keyword arguments (see _collect_kwargs)
+        headers (List(str)): The file's headers
+        sep (str): Column delimiter
+        comment (str): Character marking the remainder of a line as a comment
+
+    Raises:
+        Nothing (other than those raised by pandas)
+
+    Returns:
+        Pandas dataframe
+    """
+    if _CSV_ENGINE == "pyarrow" and not _has_comments(filepath, comment=comment):
+        df = _read_delimited_with_pyarrow(filepath, kwargs, headers, sep=sep)
+        if df is not None:
+            return df
+    return pd.read_csv(filepath, sep=sep, engine="c", comment=comment, **kwargs)
+
+
+def _read_delimited_with_pyarrow(filepath, kwargs, headers, sep=","):
+    """Reads a delimited file with pyarrow's (multithreaded) parser, or returns None if the result would not match what
+    pandas' C engine produces.
+
+    pandas' own pyarrow engine infers each column's type before applying dtype (e.g. turning the bearing "1e2" into
+    "100.0") and does not honor keep_default_na=False, so pyarrow's reader is used directly, with every column given an
+    explicit type and no null values.  That is only possible when every column being read has a str or float dtype and
+    no NA values are requested.  pyarrow also accepts some values that the C engine rejects (e.g. rows missing optional
+    trailing cells raise in pyarrow and "nan" floats raise in the C engine).  In any such case, None is returned so that
+    the C engine reads the file (and raises its usual errors).
+    """
+    dtype = kwargs.get("dtype")
+    if dtype is None or kwargs.get("keep_default_na") or kwargs.get("na_values") is not None:
+        return None
+
+    # Like the C engine, keep the file's column order
+    usecols = kwargs.get("usecols")
+    columns = [h for h in headers if usecols is None or h in usecols]
+    pa_types = {str: pa.string(), float: pa.float64()}
+    if any(dtype.get(c) not in pa_types for c in columns):
+        return None
+
+    convert_options = pa_csv.ConvertOptions(
+        column_types={c: pa_types[dtype[c]] for c in columns},
+        include_columns=columns,
+        null_values=[],
+        strings_can_be_null=False,
+        quoted_strings_can_be_null=False,
+    )
+    try:
+        df = pa_csv.read_csv(
+            filepath,
+            parse_options=pa_csv.ParseOptions(delimiter=sep),
+            convert_options=convert_options,
+        ).to_pandas()
+    except pa.ArrowException:
+        return None
+
+    # Without NA values, the C engine can only produce a NaN float from a literal "nan", which it refuses to convert
+    if any(df[c].isna().any() for c in columns if dtype[c] is float):
+        return None
+
+    return df.astype({c: dtype[c] for c in columns})
+
+
+def _has_comments(filepath, comment="#"):
+    """Determines whether a file contains the comment character anywhere, without reading it all into memory."""
+    comment_bytes = comment.encode()
+    with open(filepath, "rb") as infile:
+        for chunk in iter(lambda: infile.read(1024 * 1024), b""):
+            if comment_bytes in chunk:
+                return True
+    return False
+
+
 def validate_headers(filepath, headers, expected_headers=None):
     """Checks that all headers are the expected headers.
 
@@ -397,6 +607,30 @@ def validate_headers(filepath, headers, expected_headers=None):
         raise InvalidHeaders(headers, expected_headers, filepath)
 
 
+def _cache_per_file(read_headers):
+    """Decorator that memoizes a header-reading function by the file's absolute path and modification time (plus any
+    other arguments), so that validating headers before and after reading a file does not re-open and re-parse it.  A
+    file that is modified is re-read.
+    """
+
+    @functools.lru_cache(maxsize=32)
+    def cached_read_headers(abspath, mtime, *args, **kwargs):
+        return tuple(read_headers(abspath, *args, **kwargs))
+
+    @functools.wraps(read_headers)
+    def wrapper(filepath, *args, **kwargs):
+        # Return a new list each time so that callers cannot alter the cached headers
+        return list(
+            cached_read_headers(os.path.abspath(filepath), os.path.getmtime(filepath), *args, **kwargs)
+        )
+
+    wrapper.cache_info = cached_read_headers.cache_info
+    wrapper.cache_clear = cached_read_headers.cache_clear
+
+    return wrapper
+
+
+@_cache_per_file
 def _read_headers_from_xlsx(filepath, sheet=0):
     sheet_name = sheet
     sheets = get_sheet_names(filepath)
@@ -411,7 +645,7 @@ def _read_headers_from_xlsx(filepath, sheet=0):
             nrows=1,  # Read only the first row
             header=None,
             sheet_name=sheet_name,
-            engine="openpyxl",
+            engine=_EXCEL_ENGINE,
             comment="#",
         )
         .squeeze("columns")
@@ -423,6 +657,7 @@ def _read_headers_from_xlsx(filepath, sheet=0):
     return raw_headers.to_list()
 
 
+@_cache_per_file
 def _read_headers_from_tsv(filepath):
     # Note, setting `mangle_dupe_cols=False` would overwrite duplicates instead of raise an exception, so we're
     # checking for duplicate headers manually here.
@@ -442,6 +677,7 @@ def _read_headers_from_tsv(filepath):
     return raw_headers.to_list()
 
 
+@_cache_per_file
 def _read_headers_from_csv(filepath):
     # Note, setting `mangle_dupe_cols=False` would overwrite duplicates instead of raise an exception, so we're
     # checking for duplicate headers manually here.
@@ -461,6 +697,25 @@ def _read_headers_from_csv(filepath):
     return raw_headers.to_list()
 
 
+@_cache_per_file
+def _read_headers_from_parquet(filepath):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as ie:
+        raise ImportError(
+            f"Reading parquet file [{filepath}] requires pyarrow, which is not installed.  Install it with: "
+            "python -m pip install pyarrow"
+        ) from ie
+
+    # Only the file's footer (i.e. its schema) is read
+    schema = pq.read_schema(filepath)
+    # pandas stores a non-default index as (a) column(s), which are not headers
+    index_columns = []
+    if schema.pandas_metadata is not None:
+        index_columns = [c for c in schema.pandas_metadata.get("index_columns", []) if isinstance(c, str)]
+    return [name for name in schema.names if name not in index_columns]
+
+
 def headers_are_as_expected(expected, headers):
     """Confirms all headers are present, irrespective of case and order.
 
@@ -474,7 +729,9 @@ def headers_are_as_expected(expected, headers):
     Returns:
         bool: Whether headers are valid or not
     """
-    return sorted([s.lower() for s in headers]) == sorted([s.lower() for s in expected])
+    # Counted (instead of compared as sets) so that headers differing only in case (e.g. Bearing and bearing) are not
+    # treated as one
+    return Counter(s.lower() for s in headers) == Counter(s.lower() for s in expected)
 
 
 def get_sheet_names(filepath):
@@ -491,7 +748,7 @@ def get_sheet_names(filepath):
     Returns:
         List(str): Sheet names
     """
-    return pd.ExcelFile(filepath, engine="openpyxl").sheet_names
+    return pd.ExcelFile(filepath, engine=_EXCEL_ENGINE).sheet_names
 
 
 def is_excel(filepath):
@@ -530,11 +787,9 @@ def merge_dataframes(left, right, on):
 
 
 def _headers_are_not_unique(headers: list):
-    num_uniq_heads = len(list(dict.fromkeys(headers)))
+    num_uniq_heads = len(set(headers))
     num_heads = len(headers)
-    if num_uniq_heads != num_heads:
-        return True, num_uniq_heads, num_heads
-    return False, num_uniq_heads, num_heads
+    return num_uniq_heads != num_heads, num_uniq_heads, num_heads
 
 
 def get_row_val(row, header, strip=True, all_headers=None):